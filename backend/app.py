@@ -2,13 +2,18 @@
 Complete Closetly App for Render Deployment
 Serves HTML frontend + API backend in one app
 """
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
 import random
+import time
 from datetime import datetime
+from urllib.parse import quote, quote_plus
 import os
+import orjson
+from json_provider import OrjsonProvider, get_request_json
 
 app = Flask(__name__, static_folder='.')
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # --------------- INDIAN FASHION DATA ---------------
@@ -31,6 +36,65 @@ RETAILER_ADJUSTMENTS = {
     'Lifestyle': 1.15, 'Westside': 1.1, 'Shoppers Stop': 1.2
 }
 
+# Price band for brands not listed above
+DEFAULT_PRICE_RANGE = (500, 2000)
+
+# Retailers shown by /compare, paired with their price adjustment
+COMPARE_RETAILERS = tuple(
+    (retailer, RETAILER_ADJUSTMENTS.get(retailer, 1.0))
+    for retailer in ('Myntra', 'Flipkart', 'Amazon India', 'Ajio', 'Lifestyle', 'Westside')
+)
+
+DISCOUNT_OPTIONS = (0, 10, 15, 20, 25, 30, 40)
+
+def item_fields(item, get=dict.get):
+    """Read (brand, category, retailer) from a request item, applying the API defaults"""
+    return (
+        get(item, 'brand', 'Generic'),
+        get(item, 'category', 'Shirt'),
+        get(item, 'retailer', 'Myntra')
+    )
+
+def read_json_object():
+    """Parse the request body, returning None unless it is a JSON object"""
+    try:
+        data = get_request_json()
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+INVALID_BODY_ERROR = {'error': 'Request body must be a JSON object', 'success': False}
+
+def estimate_prices(items):
+    """Estimate prices for (brand, category, retailer) tuples in one pass"""
+    # Bind the lookups once instead of per item
+    brand_range = BRAND_PRICES.get
+    category_mult = CATEGORY_MULTIPLIERS.get
+    retailer_adj = RETAILER_ADJUSTMENTS.get
+    uniform = random.uniform
+    
+    prices = []
+    for brand, category, retailer in items:
+        base_min, base_max = brand_range(brand, DEFAULT_PRICE_RANGE)
+        prices.append(
+            uniform(base_min, base_max) * category_mult(category, 1.0)
+            * retailer_adj(retailer, 1.0) * uniform(0.95, 1.05)
+        )
+    return prices
+
+# Response timestamps at 100ms resolution, formatted once per tick
+_last_timestamp = (None, '')
+
+def current_timestamp():
+    """ISO timestamp for API responses"""
+    global _last_timestamp
+    tick = int(time.time() * 10)
+    cached_tick, text = _last_timestamp
+    if tick != cached_tick:
+        text = datetime.fromtimestamp(tick / 10).isoformat(timespec='milliseconds')
+        _last_timestamp = (tick, text)
+    return text
+
 # --------------- FRONTEND ROUTES ---------------
 
 @app.route('/')
@@ -100,51 +164,45 @@ def health():
     return jsonify({
         'status': 'healthy',
         'message': 'Closetly API is running',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': current_timestamp(),
         'region': 'India',
         'version': '1.0'
     })
 
+# The info payload never changes, so it is serialized once at import
+API_INFO_JSON = orjson.dumps({
+    'app': 'Closetly Fashion API',
+    'description': 'AI-powered fashion recommendations for India',
+    'endpoints': {
+        'GET /': 'Homepage',
+        'GET /health': 'Health check',
+        'POST /predict': 'Predict single item price',
+        'POST /compare': 'Compare prices across retailers',
+        'POST /batch_predict': 'Predict multiple items'
+    },
+    'supported_brands': list(BRAND_PRICES.keys()),
+    'supported_retailers': list(RETAILER_ADJUSTMENTS.keys()),
+    'currency': 'INR'
+})
+
 @app.route('/api/info')
 def api_info():
     """API information"""
-    return jsonify({
-        'app': 'Closetly Fashion API',
-        'description': 'AI-powered fashion recommendations for India',
-        'endpoints': {
-            'GET /': 'Homepage',
-            'GET /health': 'Health check',
-            'POST /predict': 'Predict single item price',
-            'POST /compare': 'Compare prices across retailers',
-            'POST /batch_predict': 'Predict multiple items'
-        },
-        'supported_brands': list(BRAND_PRICES.keys()),
-        'supported_retailers': list(RETAILER_ADJUSTMENTS.keys()),
-        'currency': 'INR'
-    })
+    return app.response_class(API_INFO_JSON, mimetype='application/json')
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """Predict price for a single fashion item"""
     try:
-        data = request.get_json()
+        data = read_json_object()
+        if data is None:
+            return jsonify(INVALID_BODY_ERROR), 400
         
-        brand = data.get('brand', 'Generic')
-        category = data.get('category', 'Shirt')
-        retailer = data.get('retailer', 'Myntra')
+        brand, category, retailer = item_fields(data)
         discount_percent = data.get('discount_percent', 0)
         
         # Calculate price
-        if brand in BRAND_PRICES:
-            base_min, base_max = BRAND_PRICES[brand]
-        else:
-            base_min, base_max = (500, 2000)
-        
-        base_price = random.uniform(base_min, base_max)
-        category_mult = CATEGORY_MULTIPLIERS.get(category, 1.0)
-        retailer_adj = RETAILER_ADJUSTMENTS.get(retailer, 1.0)
-        
-        price = base_price * category_mult * retailer_adj * random.uniform(0.95, 1.05)
+        price = estimate_prices([(brand, category, retailer)])[0]
         
         if discount_percent > 0:
             original_price = price / (1 - discount_percent/100)
@@ -168,7 +226,7 @@ def predict():
                 'discount_percent': discount_percent,
                 'currency': 'INR'
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_timestamp()
         })
         
     except Exception as e:
@@ -181,28 +239,28 @@ def predict():
 def compare():
     """Compare prices across retailers"""
     try:
-        data = request.get_json()
+        data = read_json_object()
+        if data is None:
+            return jsonify(INVALID_BODY_ERROR), 400
+        
         product_name = data.get('product_name', '')
         brand = data.get('brand', 'Generic')
         category = data.get('category', 'Shirt')
         
-        retailers = ['Myntra', 'Flipkart', 'Amazon India', 'Ajio', 'Lifestyle', 'Westside']
         comparisons = []
         
         # Get base price
-        if brand in BRAND_PRICES:
-            base_min, base_max = BRAND_PRICES[brand]
-        else:
-            base_min, base_max = (500, 2000)
+        base_min, base_max = BRAND_PRICES.get(brand, DEFAULT_PRICE_RANGE)
         
         base_price = random.uniform(base_min, base_max)
         category_mult = CATEGORY_MULTIPLIERS.get(category, 1.0)
         base_price = base_price * category_mult
         
-        for retailer in retailers:
-            retailer_adj = RETAILER_ADJUSTMENTS.get(retailer, 1.0)
+        # Draw every retailer's discount at once
+        discounts = random.choices(DISCOUNT_OPTIONS, k=len(COMPARE_RETAILERS))
+        
+        for (retailer, retailer_adj), discount in zip(COMPARE_RETAILERS, discounts):
             price = base_price * retailer_adj * random.uniform(0.95, 1.05)
-            discount = random.choice([0, 10, 15, 20, 25, 30, 40])
             
             comparisons.append({
                 'retailer': retailer,
@@ -219,7 +277,7 @@ def compare():
             'brand': brand,
             'comparisons': comparisons,
             'best_deal': comparisons[0],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_timestamp()
         })
         
     except Exception as e:
@@ -232,68 +290,84 @@ def compare():
 def batch_predict():
     """Predict prices for multiple items"""
     try:
-        data = request.get_json()
+        data = read_json_object()
+        if data is None:
+            return jsonify(INVALID_BODY_ERROR), 400
+        
         items = data.get('items', [])
         
         if not items:
             return jsonify({'error': 'No items provided', 'success': False}), 400
         
-        predictions = []
+        # Reject malformed batches before pricing any of them
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return jsonify({'error': 'items must be a list of objects', 'success': False}), 400
         
-        for item in items:
-            brand = item.get('brand', 'Generic')
-            category = item.get('category', 'Shirt')
-            retailer = item.get('retailer', 'Myntra')
-            
-            if brand in BRAND_PRICES:
-                base_min, base_max = BRAND_PRICES[brand]
-            else:
-                base_min, base_max = (500, 2000)
-            
-            base_price = random.uniform(base_min, base_max)
-            category_mult = CATEGORY_MULTIPLIERS.get(category, 1.0)
-            retailer_adj = RETAILER_ADJUSTMENTS.get(retailer, 1.0)
-            
-            price = base_price * category_mult * retailer_adj * random.uniform(0.95, 1.05)
-            
-            predictions.append({
+        # Read every item's fields first, then price the whole batch at once
+        fields = list(map(item_fields, items))
+        prices = estimate_prices(fields)
+        
+        predictions = [
+            {
                 'item': {'brand': brand, 'category': category},
                 'predicted_price': round(price, 2),
                 'success': True
-            })
+            }
+            for (brand, category, _), price in zip(fields, prices)
+        ]
         
         return jsonify({
             'success': True,
             'total_items': len(items),
             'predictions': predictions,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_timestamp()
         })
         
     except Exception as e:
         return jsonify({'error': str(e), 'success': False}), 500
 
+# Search URL prefixes; the encoded product name is appended
+RETAILER_SEARCH_URLS = {
+    'Flipkart': 'https://www.flipkart.com/search?q=',
+    'Amazon India': 'https://www.amazon.in/s?k=',
+    'Ajio': 'https://www.ajio.com/search/?text=',
+    'Lifestyle': 'https://www.lifestylestores.com/in/en/search/?text=',
+    'Westside': 'https://www.westside.com/search?q='
+}
+
+def search_url_builder(base_url):
+    """Return a URL builder with the retailer's search prefix baked in"""
+    return lambda product_name: base_url + quote_plus(product_name)
+
+def myntra_url(product_name):
+    """Myntra takes a slug in the path rather than a search query"""
+    return 'https://www.myntra.com/' + quote(product_name.lower().replace(' ', '-'))
+
+# One specialized URL builder per known retailer, resolved by a single lookup
+RETAILER_URL_BUILDERS = {
+    'Myntra': myntra_url,
+    **{retailer: search_url_builder(base_url) for retailer, base_url in RETAILER_SEARCH_URLS.items()}
+}
+
 def get_retailer_url(retailer, product_name):
     """Generate retailer URLs"""
-    product_slug = product_name.lower().replace(' ', '-')
-    urls = {
-        'Myntra': f"https://www.myntra.com/{product_slug}",
-        'Flipkart': f"https://www.flipkart.com/search?q={product_name.replace(' ', '+')}",
-        'Amazon India': f"https://www.amazon.in/s?k={product_name.replace(' ', '+')}",
-        'Ajio': f"https://www.ajio.com/search/?text={product_name.replace(' ', '+')}",
-        'Lifestyle': f"https://www.lifestylestores.com/in/en/search/?text={product_name.replace(' ', '+')}",
-        'Westside': f"https://www.westside.com/search?q={product_name.replace(' ', '+')}"
-    }
-    return urls.get(retailer, f"https://www.google.com/search?q={product_name}+{retailer}")
+    build_url = RETAILER_URL_BUILDERS.get(retailer)
+    if build_url is None:
+        return 'https://www.google.com/search?q=' + quote_plus(f'{product_name} {retailer}')
+    return build_url(product_name)
 
 # --------------- ERROR HANDLERS ---------------
 
+# Bots and typos hit the 404 handler often; its body is fixed
+NOT_FOUND_JSON = orjson.dumps({
+    'error': 'Endpoint not found',
+    'message': 'Please check the API documentation',
+    'available_endpoints': ['/health', '/predict', '/compare', '/batch_predict']
+})
+
 @app.errorhandler(404)
 def not_found(e):
-    return jsonify({
-        'error': 'Endpoint not found',
-        'message': 'Please check the API documentation',
-        'available_endpoints': ['/health', '/predict', '/compare', '/batch_predict']
-    }), 404
+    return app.response_class(NOT_FOUND_JSON, status=404, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(e):
@@ -6,17 +6,124 @@ from flask import Flask, request, jsonify, session
 from flask_cors import CORS
 import sqlite3
 import hashlib
+import hmac
 import secrets
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-import json
+import orjson
+from json_provider import OrjsonProvider, get_request_json
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(32))
 CORS(app, supports_credentials=True)
 
 DATABASE = 'closetly_users.db'
 
+# pbkdf2_hmac releases the GIL while it runs, so other request threads
+# keep going during a login or signup
+PBKDF2_ITERATIONS = 100000
+
+# One long-lived connection per worker thread; it is closed when its
+# thread exits and the thread-local storage is collected
+_db_local = threading.local()
+
+def get_db():
+    """Return this thread's database connection, opening it on first use"""
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE)
+        # WAL lets readers proceed while another thread writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        _db_local.conn = conn
+    return conn
+
+# Profile statements, kept as constants so each pooled connection's
+# statement cache reuses the compiled form. The update and insert take
+# their parameters in the same order so save_profile builds them once
+SQL_UPDATE_PROFILE = '''
+    UPDATE user_profiles
+    SET gender = ?, body_type = ?, undertone = ?, color_season = ?,
+        dominant_colors = ?, measurements = ?, preferences = ?,
+        updated_at = ?
+    WHERE user_id = ?
+'''
+
+SQL_INSERT_PROFILE = '''
+    INSERT INTO user_profiles
+    (gender, body_type, undertone, color_season,
+     dominant_colors, measurements, preferences, updated_at, user_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_PROFILE_VERSION = 'SELECT updated_at FROM user_profiles WHERE user_id = ?'
+
+SQL_GET_PROFILE = '''
+    SELECT gender, body_type, undertone, color_season,
+           dominant_colors, measurements, preferences, updated_at
+    FROM user_profiles WHERE user_id = ?
+'''
+
+# Parsed profiles per user, tagged with the row's updated_at. A hit still
+# checks the version through the covering index, so a profile saved by
+# another gunicorn worker is never served stale
+PROFILE_CACHE_SIZE = 4096
+_profile_cache = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+def get_profile_version(cursor, user_id):
+    """Return the profile row's updated_at, or None if the user has no profile"""
+    row = cursor.execute(SQL_PROFILE_VERSION, (user_id,)).fetchone()
+    return row[0] if row else None
+
+def profile_etag(user_id, version):
+    """Opaque validator for one version of a user's profile"""
+    return hashlib.blake2b(f'{user_id}:{version}'.encode(), digest_size=16).hexdigest()
+
+def load_profile(cursor, user_id, version):
+    """Return (version, parsed profile), reusing the cached copy while its version is unchanged
+
+    On a miss the version comes from the same row read as the profile, so a
+    save landing after the caller's version check is never cached under
+    the old version.
+    """
+    with _profile_cache_lock:
+        cached = _profile_cache.get(user_id)
+        if cached and cached[0] == version:
+            _profile_cache.move_to_end(user_id)
+            return cached
+    
+    profile = cursor.execute(SQL_GET_PROFILE, (user_id,)).fetchone()
+    if not profile:
+        return None, None
+    
+    version = profile[7]
+    
+    parsed = {
+        'gender': profile[0],
+        'body_type': profile[1],
+        'undertone': profile[2],
+        'color_season': profile[3],
+        'dominant_colors': orjson.loads(profile[4] or '[]'),
+        'measurements': orjson.loads(profile[5] or '{}'),
+        'preferences': orjson.loads(profile[6] or '{}')
+    }
+    
+    with _profile_cache_lock:
+        _profile_cache[user_id] = (version, parsed)
+        _profile_cache.move_to_end(user_id)
+        if len(_profile_cache) > PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    return version, parsed
+
+def to_json_text(value):
+    """Serialize a profile field for a TEXT column"""
+    return orjson.dumps(value).decode()
+
 # Initialize Database
 def init_db():
     """Create database tables"""
@@ -52,6 +159,13 @@ def init_db():
         )
     ''')
     
+    # Profile reads and writes always look up by user_id; updated_at is
+    # included so the profile cache's version check never touches the row
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_profiles_user_version
+        ON user_profiles (user_id, updated_at)
+    ''')
+    
     # User sessions table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS user_sessions (
@@ -81,49 +195,47 @@ def init_db():
     conn.close()
     print("✅ Database initialized successfully")
 
+# Create tables at import so the app also works when served by gunicorn
+# (runs once in the master under preload_app)
+init_db()
+
 # Password hashing
 def hash_password(password):
     """Hash password with salt"""
     salt = secrets.token_hex(16)
-    pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
+    pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PBKDF2_ITERATIONS)
     return f"{salt}${pwd_hash.hex()}"
 
 def verify_password(password, password_hash):
     """Verify password against hash"""
     try:
         salt, pwd_hash = password_hash.split('$')
-        test_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return test_hash.hex() == pwd_hash
+        test_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), PBKDF2_ITERATIONS)
+        return hmac.compare_digest(test_hash.hex(), pwd_hash)
     except:
         return False
 
 # Session management
-def create_session(user_id):
-    """Create new session token"""
+def insert_session(conn, user_id):
+    """Insert a new session token without committing"""
     token = secrets.token_urlsafe(32)
     expires_at = datetime.now() + timedelta(days=7)
     
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    cursor.execute('''
+    conn.execute('''
         INSERT INTO user_sessions (user_id, session_token, expires_at)
         VALUES (?, ?, ?)
     ''', (user_id, token, expires_at))
-    conn.commit()
-    conn.close()
     
     return token
 
 def verify_session(token):
     """Verify session token and return user_id"""
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     cursor.execute('''
         SELECT user_id FROM user_sessions
         WHERE session_token = ? AND expires_at > ?
     ''', (token, datetime.now()))
     result = cursor.fetchone()
-    conn.close()
     
     return result[0] if result else None
 
@@ -133,7 +245,7 @@ def verify_session(token):
 def signup():
     """Register new user"""
     try:
-        data = request.get_json()
+        data = get_request_json()
         
         # Validate input
         required_fields = ['email', 'password', 'full_name']
@@ -165,41 +277,38 @@ def signup():
         # Hash password
         password_hash = hash_password(password)
         
-        # Insert user
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
+        # Insert user and first session in one transaction; a duplicate
+        # email inserts nothing and returns no row
+        conn = get_db()
+        with conn:
+            rows = conn.execute('''
                 INSERT INTO users (email, password_hash, full_name)
                 VALUES (?, ?, ?)
-            ''', (email, password_hash, full_name))
-            
-            user_id = cursor.lastrowid
-            conn.commit()
+                ON CONFLICT(email) DO NOTHING
+                RETURNING id
+            ''', (email, password_hash, full_name)).fetchall()
             
-            # Create session
-            session_token = create_session(user_id)
+            if not rows:
+                return jsonify({
+                    'success': False,
+                    'error': 'Email already registered'
+                }), 409
             
-            conn.close()
+            user_id = rows[0][0]
             
-            return jsonify({
-                'success': True,
-                'message': 'Account created successfully',
-                'user': {
-                    'id': user_id,
-                    'email': email,
-                    'full_name': full_name
-                },
-                'session_token': session_token
-            }), 201
-            
-        except sqlite3.IntegrityError:
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': 'Email already registered'
-            }), 409
+            # Create session
+            session_token = insert_session(conn, user_id)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Account created successfully',
+            'user': {
+                'id': user_id,
+                'email': email,
+                'full_name': full_name
+            },
+            'session_token': session_token
+        }), 201
             
     except Exception as e:
         return jsonify({
@@ -211,7 +320,7 @@ def signup():
 def login():
     """User login"""
     try:
-        data = request.get_json()
+        data = get_request_json()
         
         email = data.get('email', '').lower().strip()
         password = data.get('password', '')
@@ -223,7 +332,7 @@ def login():
             }), 400
         
         # Get user
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         cursor.execute('''
             SELECT id, email, password_hash, full_name
@@ -231,9 +340,10 @@ def login():
         ''', (email,))
         
         user = cursor.fetchone()
+        # Release the read statement before the slow hash check
+        cursor.close()
         
         if not user:
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Invalid email or password'
@@ -243,21 +353,17 @@ def login():
         
         # Verify password
         if not verify_password(password, password_hash):
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Invalid email or password'
             }), 401
         
-        # Update last login
-        cursor.execute('''
-            UPDATE users SET last_login = ? WHERE id = ?
-        ''', (datetime.now(), user_id))
-        conn.commit()
-        conn.close()
-        
-        # Create session
-        session_token = create_session(user_id)
+        # Create session and record last login in a single commit
+        with conn:
+            session_token = insert_session(conn, user_id)
+            conn.execute('''
+                UPDATE users SET last_login = ? WHERE id = ?
+            ''', (datetime.now(), user_id))
         
         return jsonify({
             'success': True,
@@ -289,11 +395,9 @@ def logout():
             }), 400
         
         # Delete session
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM user_sessions WHERE session_token = ?', (token,))
-        conn.commit()
-        conn.close()
+        conn = get_db()
+        with conn:
+            conn.execute('DELETE FROM user_sessions WHERE session_token = ?', (token,))
         
         return jsonify({
             'success': True,
@@ -319,54 +423,30 @@ def save_profile():
                 'error': 'Invalid or expired session'
             }), 401
         
-        data = request.get_json()
+        data = get_request_json()
+        get = data.get
+        
+        # Serialize before taking the write lock
+        params = (
+            get('gender'),
+            get('body_type'),
+            get('undertone'),
+            get('color_season'),
+            to_json_text(get('dominant_colors', [])),
+            to_json_text(get('measurements', {})),
+            to_json_text(get('preferences', {})),
+            datetime.now(),
+            user_id
+        )
         
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
+        conn = get_db()
+        with conn:
+            # Update existing profile, or insert one if there was none
+            if conn.execute(SQL_UPDATE_PROFILE, params).rowcount == 0:
+                conn.execute(SQL_INSERT_PROFILE, params)
         
-        # Check if profile exists
-        cursor.execute('SELECT id FROM user_profiles WHERE user_id = ?', (user_id,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing profile
-            cursor.execute('''
-                UPDATE user_profiles
-                SET gender = ?, body_type = ?, undertone = ?, color_season = ?,
-                    dominant_colors = ?, measurements = ?, preferences = ?,
-                    updated_at = ?
-                WHERE user_id = ?
-            ''', (
-                data.get('gender'),
-                data.get('body_type'),
-                data.get('undertone'),
-                data.get('color_season'),
-                json.dumps(data.get('dominant_colors', [])),
-                json.dumps(data.get('measurements', {})),
-                json.dumps(data.get('preferences', {})),
-                datetime.now(),
-                user_id
-            ))
-        else:
-            # Insert new profile
-            cursor.execute('''
-                INSERT INTO user_profiles
-                (user_id, gender, body_type, undertone, color_season,
-                 dominant_colors, measurements, preferences)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user_id,
-                data.get('gender'),
-                data.get('body_type'),
-                data.get('undertone'),
-                data.get('color_season'),
-                json.dumps(data.get('dominant_colors', [])),
-                json.dumps(data.get('measurements', {})),
-                json.dumps(data.get('preferences', {}))
-            ))
-        
-        conn.commit()
-        conn.close()
+        with _profile_cache_lock:
+            _profile_cache.pop(user_id, None)
         
         return jsonify({
             'success': True,
@@ -392,36 +472,30 @@ def get_profile():
                 'error': 'Invalid or expired session'
             }), 401
         
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT gender, body_type, undertone, color_season,
-                   dominant_colors, measurements, preferences
-            FROM user_profiles WHERE user_id = ?
-        ''', (user_id,))
-        
-        profile = cursor.fetchone()
-        conn.close()
+        cursor = get_db().cursor()
+        version = get_profile_version(cursor, user_id)
         
-        if not profile:
+        if version is None:
             return jsonify({
                 'success': True,
                 'profile': None
             }), 200
         
-        return jsonify({
-            'success': True,
-            'profile': {
-                'gender': profile[0],
-                'body_type': profile[1],
-                'undertone': profile[2],
-                'color_season': profile[3],
-                'dominant_colors': json.loads(profile[4] or '[]'),
-                'measurements': json.loads(profile[5] or '{}'),
-                'preferences': json.loads(profile[6] or '{}')
-            }
-        }), 200
+        # Let the browser revalidate its copy instead of refetching it
+        if request.if_none_match.contains(profile_etag(user_id, version)):
+            response = app.response_class(status=304)
+        else:
+            # The body may come from a newer row than the version check
+            # saw; tag it with the version it was actually read at
+            version, profile = load_profile(cursor, user_id, version)
+            response = jsonify({
+                'success': True,
+                'profile': profile
+            })
+        
+        response.set_etag(profile_etag(user_id, version))
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
         
     except Exception as e:
         return jsonify({
@@ -443,11 +517,9 @@ def verify_profile():
             }), 401
         
         # Get user info
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
+        cursor = get_db().cursor()
         cursor.execute('SELECT email, full_name FROM users WHERE id = ?', (user_id,))
         user = cursor.fetchone()
-        conn.close()
         
         if not user:
             return jsonify({
@@ -472,7 +544,6 @@ def verify_profile():
         }), 500
 
 if __name__ == '__main__':
-    init_db()
     print("\n" + "="*60)
     print("CLOSETLY AUTHENTICATION SERVER")
     print("="*60)
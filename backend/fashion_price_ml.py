@@ -7,19 +7,152 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
 from xgboost import XGBRegressor
-from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
-import requests
-from bs4 import BeautifulSoup
-import json
-import pickle
+import os
 from datetime import datetime
+import joblib
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
 import warnings
 warnings.filterwarnings('ignore')
 
 # 1. DATA COLLECTION MODULE
 
+BRANDS = {
+    'premium_indian': ['Van Heusen', 'Allen Solly', 'Louis Philippe', 'Peter England', 'Raymond',
+                       'AND', 'W for Woman', 'Forever New', 'Vero Moda', 'Only'],
+    'luxury': ['Zara', 'Marks & Spencer', 'Tommy Hilfiger', 'Calvin Klein'],
+    'affordable': ['Flying Machine', 'Roadster', 'Wrogn', 'Mast & Harbour', 'Athena',
+                   'HRX', 'Being Human', 'Breakbounce'],
+    'international': ['Levi\'s', 'Nike', 'Adidas', 'Puma', 'H&M', 'US Polo Assn']
+}
+
+ALL_BRANDS = [b for tier in BRANDS.values() for b in tier]
+
+CATEGORIES = ['Jeans', 'Dress', 'Shirt', 'Blazer', 'T-Shirt', 'Jacket',
+              'Sweater', 'Pants', 'Skirt', 'Coat', 'Hoodie', 'Polo', 'Chinos']
+
+MATERIALS = ['Cotton', 'Polyester', 'Denim', 'Wool', 'Silk', 'Leather',
+             'Linen', 'Synthetic', 'Viscose', 'Blend']
+
+RETAILERS = ['Myntra', 'Ajio', 'Flipkart', 'Amazon India', 'Lifestyle',
+             'Reliance Trends', 'Westside', 'Shoppers Stop', 'Max Fashion']
+
+SEASONS = ['Spring', 'Summer', 'Monsoon', 'Winter', 'All-Season']
+
+# Product image mapping (Unsplash or placeholder URLs)
+CATEGORY_IMAGE_URLS = {
+    'Jeans': 'https://images.unsplash.com/photo-1542272604-787c3835535d?w=400',
+    'Dress': 'https://images.unsplash.com/photo-1595777457583-95e059d581b8?w=400',
+    'Shirt': 'https://images.unsplash.com/photo-1602810318383-e386cc2a3ccf?w=400',
+    'Blazer': 'https://images.unsplash.com/photo-1591047139829-d91aecb6caea?w=400',
+    'T-Shirt': 'https://images.unsplash.com/photo-1521572163474-6864f9cf17ab?w=400',
+    'Jacket': 'https://images.unsplash.com/photo-1551028719-00167b16eac5?w=400',
+    'Sweater': 'https://images.unsplash.com/photo-1576566588028-4147f3842f27?w=400',
+    'Pants': 'https://images.unsplash.com/photo-1473966968600-fa801b869a1a?w=400',
+    'Skirt': 'https://images.unsplash.com/photo-1583496661160-fb5886a0aaaa?w=400',
+    'Coat': 'https://images.unsplash.com/photo-1539533018447-63fcce2678e3?w=400',
+    'Hoodie': 'https://images.unsplash.com/photo-1556821840-3a63f95609a7?w=400',
+    'Polo': 'https://images.unsplash.com/photo-1586790170083-2f9ceadc732d?w=400',
+    'Chinos': 'https://images.unsplash.com/photo-1473966968600-fa801b869a1a?w=400'
+}
+
+# Retailer URL templates
+RETAILER_URLS = {
+    'Myntra': 'https://www.myntra.com/shop/',
+    'Ajio': 'https://www.ajio.com/search/?text=',
+    'Flipkart': 'https://www.flipkart.com/search?q=',
+    'Amazon India': 'https://www.amazon.in/s?k=',
+    'Lifestyle': 'https://www.lifestylestores.com/in/en/search/?text=',
+    'Reliance Trends': 'https://www.reliancetrends.com/search?q=',
+    'Westside': 'https://www.westside.com/search?q=',
+    'Shoppers Stop': 'https://www.shoppersstop.com/search?q=',
+    'Max Fashion': 'https://www.maxfashion.in/in/en/search/?text='
+}
+
+# Brand price ranges (base prices in INR)
+BRAND_BASE_PRICES = {
+    # Premium Indian
+    'Van Heusen': (800, 2500), 'Allen Solly': (900, 2800), 'Louis Philippe': (1000, 3500),
+    'Peter England': (600, 2000), 'Raymond': (1200, 5000),
+    'AND': (800, 3000), 'W for Woman': (700, 2500), 'Forever New': (1200, 4000),
+    'Vero Moda': (1000, 3500), 'Only': (800, 2800),
+
+    # Luxury
+    'Zara': (1500, 6000), 'Marks & Spencer': (1500, 5500),
+    'Tommy Hilfiger': (2000, 8000), 'Calvin Klein': (1800, 7000),
+
+    # Affordable
+    'Flying Machine': (500, 1500), 'Roadster': (400, 1200), 'Wrogn': (600, 1800),
+    'Mast & Harbour': (400, 1300), 'Athena': (500, 1500), 'HRX': (600, 1800),
+    'Being Human': (700, 2000), 'Breakbounce': (800, 2200),
+
+    # International
+    'Levi\'s': (1500, 4000), 'Nike': (1200, 5000), 'Adidas': (1000, 4500),
+    'Puma': (900, 3500), 'H&M': (500, 2000), 'US Polo Assn': (800, 2500)
+}
+
+# Category multipliers
+CATEGORY_MULTIPLIERS = {
+    'Jeans': 1.0, 'Dress': 1.2, 'Shirt': 0.8, 'Blazer': 1.6,
+    'T-Shirt': 0.4, 'Jacket': 1.5, 'Sweater': 0.9, 'Pants': 0.9,
+    'Skirt': 0.8, 'Coat': 2.0, 'Hoodie': 0.7, 'Polo': 0.6, 'Chinos': 0.9
+}
+
+# Material adjustment
+MATERIAL_ADJUSTMENTS = {
+    'Silk': 1.3, 'Leather': 1.5, 'Wool': 1.2,
+    'Cotton': 1.0, 'Polyester': 0.9, 'Denim': 1.0,
+    'Linen': 1.1, 'Synthetic': 0.8, 'Viscose': 0.9, 'Blend': 0.95
+}
+
+# Retailer adjustment
+RETAILER_ADJUSTMENTS = {
+    'Shoppers Stop': 1.2, 'Lifestyle': 1.15, 'Westside': 1.1,
+    'Myntra': 1.0, 'Ajio': 0.98, 'Flipkart': 0.95,
+    'Amazon India': 0.95, 'Reliance Trends': 0.9, 'Max Fashion': 0.85
+}
+
+# Rating (higher price brands tend to have better ratings)
+TOP_RATED_BRANDS = {'Zara', 'Marks & Spencer', 'Tommy Hilfiger', 'Calvin Klein', 'Raymond'}
+WELL_RATED_BRANDS = {'Van Heusen', 'Allen Solly', 'Louis Philippe', 'Levi\'s'}
+
+# Lookup arrays laid out by position in the lists above, so generated
+# samples gather every per-value attribute with integer indices
+BRAND_NAMES = np.array(ALL_BRANDS, dtype=object)
+BRAND_MIN_PRICES = np.array([BRAND_BASE_PRICES[b][0] for b in ALL_BRANDS], dtype=np.float64)
+BRAND_MAX_PRICES = np.array([BRAND_BASE_PRICES[b][1] for b in ALL_BRANDS], dtype=np.float64)
+BRAND_RATINGS = np.array([
+    4.5 if b in TOP_RATED_BRANDS else 4.3 if b in WELL_RATED_BRANDS else 3.8
+    for b in ALL_BRANDS
+])
+
+CATEGORY_NAMES = np.array(CATEGORIES, dtype=object)
+CATEGORY_MULTIPLIER_VALUES = np.array([CATEGORY_MULTIPLIERS[c] for c in CATEGORIES])
+CATEGORY_IMAGES = np.array([
+    CATEGORY_IMAGE_URLS.get(c, 'https://via.placeholder.com/400x400?text=Product')
+    for c in CATEGORIES
+], dtype=object)
+
+MATERIAL_NAMES = np.array(MATERIALS, dtype=object)
+MATERIAL_ADJUSTMENT_VALUES = np.array([MATERIAL_ADJUSTMENTS[m] for m in MATERIALS])
+
+RETAILER_NAMES = np.array(RETAILERS, dtype=object)
+RETAILER_ADJUSTMENT_VALUES = np.array([RETAILER_ADJUSTMENTS[r] for r in RETAILERS])
+RETAILER_URL_PREFIXES = np.array([RETAILER_URLS[r] for r in RETAILERS], dtype=object)
+
+SEASON_NAMES = np.array(SEASONS, dtype=object)
+
+# Product names and retailer search queries for every brand/category pair
+PRODUCT_NAMES = np.array([[f"{b} {c}" for c in CATEGORIES] for b in ALL_BRANDS], dtype=object)
+SEARCH_QUERIES = np.array([[name.replace(' ', '+') for name in row] for row in PRODUCT_NAMES],
+                          dtype=object)
+
+# Discount percentage (common in India)
+DISCOUNT_OPTIONS = np.array([0, 10, 15, 20, 25, 30, 40, 50, 60, 70])
+DISCOUNT_WEIGHTS = [0.1, 0.1, 0.15, 0.15, 0.15, 0.15, 0.1, 0.05, 0.03, 0.02]
+
 
 class FashionDataScraper:
     """Scrapes fashion product data from multiple retailers"""
@@ -33,163 +166,48 @@ class FashionDataScraper:
     def generate_synthetic_data(self, n_samples=1000):
         """Generate synthetic fashion data for training - INDIAN MARKET with IMAGES"""
 
-        brands = {
-            'premium_indian': ['Van Heusen', 'Allen Solly', 'Louis Philippe', 'Peter England', 'Raymond',
-                              'AND', 'W for Woman', 'Forever New', 'Vero Moda', 'Only'],
-            'luxury': ['Zara', 'Marks & Spencer', 'Tommy Hilfiger', 'Calvin Klein'],
-            'affordable': ['Flying Machine', 'Roadster', 'Wrogn', 'Mast & Harbour', 'Athena',
-                          'HRX', 'Being Human', 'Breakbounce'],
-            'international': ['Levi\'s', 'Nike', 'Adidas', 'Puma', 'H&M', 'US Polo Assn']
-        }
-
-        all_brands = [b for category in brands.values() for b in category]
-
-        categories = ['Jeans', 'Dress', 'Shirt', 'Blazer', 'T-Shirt', 'Jacket',
-                      'Sweater', 'Pants', 'Skirt', 'Coat', 'Hoodie', 'Polo', 'Chinos']
-
-        materials = ['Cotton', 'Polyester', 'Denim', 'Wool', 'Silk', 'Leather',
-                     'Linen', 'Synthetic', 'Viscose', 'Blend']
-
-        retailers = ['Myntra', 'Ajio', 'Flipkart', 'Amazon India', 'Lifestyle',
-                     'Reliance Trends', 'Westside', 'Shoppers Stop', 'Max Fashion']
-
-        seasons = ['Spring', 'Summer', 'Monsoon', 'Winter', 'All-Season']
-
-        # Product image mapping (Unsplash or placeholder URLs)
-        category_image_urls = {
-            'Jeans': 'https://images.unsplash.com/photo-1542272604-787c3835535d?w=400',
-            'Dress': 'https://images.unsplash.com/photo-1595777457583-95e059d581b8?w=400',
-            'Shirt': 'https://images.unsplash.com/photo-1602810318383-e386cc2a3ccf?w=400',
-            'Blazer': 'https://images.unsplash.com/photo-1591047139829-d91aecb6caea?w=400',
-            'T-Shirt': 'https://images.unsplash.com/photo-1521572163474-6864f9cf17ab?w=400',
-            'Jacket': 'https://images.unsplash.com/photo-1551028719-00167b16eac5?w=400',
-            'Sweater': 'https://images.unsplash.com/photo-1576566588028-4147f3842f27?w=400',
-            'Pants': 'https://images.unsplash.com/photo-1473966968600-fa801b869a1a?w=400',
-            'Skirt': 'https://images.unsplash.com/photo-1583496661160-fb5886a0aaaa?w=400',
-            'Coat': 'https://images.unsplash.com/photo-1539533018447-63fcce2678e3?w=400',
-            'Hoodie': 'https://images.unsplash.com/photo-1556821840-3a63f95609a7?w=400',
-            'Polo': 'https://images.unsplash.com/photo-1586790170083-2f9ceadc732d?w=400',
-            'Chinos': 'https://images.unsplash.com/photo-1473966968600-fa801b869a1a?w=400'
-        }
-
-        # Retailer URL templates
-        retailer_urls = {
-            'Myntra': 'https://www.myntra.com/shop/',
-            'Ajio': 'https://www.ajio.com/search/?text=',
-            'Flipkart': 'https://www.flipkart.com/search?q=',
-            'Amazon India': 'https://www.amazon.in/s?k=',
-            'Lifestyle': 'https://www.lifestylestores.com/in/en/search/?text=',
-            'Reliance Trends': 'https://www.reliancetrends.com/search?q=',
-            'Westside': 'https://www.westside.com/search?q=',
-            'Shoppers Stop': 'https://www.shoppersstop.com/search?q=',
-            'Max Fashion': 'https://www.maxfashion.in/in/en/search/?text='
-        }
-
-        # Brand price ranges (base prices in INR)
-        brand_base_prices = {
-            # Premium Indian
-            'Van Heusen': (800, 2500), 'Allen Solly': (900, 2800), 'Louis Philippe': (1000, 3500),
-            'Peter England': (600, 2000), 'Raymond': (1200, 5000),
-            'AND': (800, 3000), 'W for Woman': (700, 2500), 'Forever New': (1200, 4000),
-            'Vero Moda': (1000, 3500), 'Only': (800, 2800),
-
-            # Luxury
-            'Zara': (1500, 6000), 'Marks & Spencer': (1500, 5500),
-            'Tommy Hilfiger': (2000, 8000), 'Calvin Klein': (1800, 7000),
-
-            # Affordable
-            'Flying Machine': (500, 1500), 'Roadster': (400, 1200), 'Wrogn': (600, 1800),
-            'Mast & Harbour': (400, 1300), 'Athena': (500, 1500), 'HRX': (600, 1800),
-            'Being Human': (700, 2000), 'Breakbounce': (800, 2200),
-
-            # International
-            'Levi\'s': (1500, 4000), 'Nike': (1200, 5000), 'Adidas': (1000, 4500),
-            'Puma': (900, 3500), 'H&M': (500, 2000), 'US Polo Assn': (800, 2500)
-        }
-
-        # Category multipliers
-        category_multipliers = {
-            'Jeans': 1.0, 'Dress': 1.2, 'Shirt': 0.8, 'Blazer': 1.6,
-            'T-Shirt': 0.4, 'Jacket': 1.5, 'Sweater': 0.9, 'Pants': 0.9,
-            'Skirt': 0.8, 'Coat': 2.0, 'Hoodie': 0.7, 'Polo': 0.6, 'Chinos': 0.9
-        }
-
-        data = []
-
-        for _ in range(n_samples):
-            brand = np.random.choice(all_brands)
-            category = np.random.choice(categories)
-            material = np.random.choice(materials)
-            retailer = np.random.choice(retailers)
-            season = np.random.choice(seasons)
-
-            # Base price from brand (in INR)
-            base_min, base_max = brand_base_prices[brand]
-            base_price = np.random.uniform(base_min, base_max)
-
-            # Apply category multiplier
-            price = base_price * category_multipliers[category]
-
-            # Material adjustment
-            material_adjustments = {
-                'Silk': 1.3, 'Leather': 1.5, 'Wool': 1.2,
-                'Cotton': 1.0, 'Polyester': 0.9, 'Denim': 1.0,
-                'Linen': 1.1, 'Synthetic': 0.8, 'Viscose': 0.9, 'Blend': 0.95
-            }
-            price *= material_adjustments[material]
-
-            # Retailer adjustment
-            retailer_adjustments = {
-                'Shoppers Stop': 1.2, 'Lifestyle': 1.15, 'Westside': 1.1,
-                'Myntra': 1.0, 'Ajio': 0.98, 'Flipkart': 0.95,
-                'Amazon India': 0.95, 'Reliance Trends': 0.9, 'Max Fashion': 0.85
-            }
-            price *= retailer_adjustments[retailer]
-
-            # Add some randomness
-            price *= np.random.uniform(0.9, 1.1)
-
-            # Rating (higher price brands tend to have better ratings)
-            base_rating = 3.8
-            if brand in ['Zara', 'Marks & Spencer', 'Tommy Hilfiger', 'Calvin Klein', 'Raymond']:
-                base_rating = 4.5
-            elif brand in ['Van Heusen', 'Allen Solly', 'Louis Philippe', 'Levi\'s']:
-                base_rating = 4.3
-            rating = min(5.0, base_rating + np.random.uniform(-0.4, 0.4))
-
-            # Discount percentage (common in India)
-            discount = np.random.choice([0, 10, 15, 20, 25, 30, 40, 50, 60, 70],
-                                       p=[0.1, 0.1, 0.15, 0.15, 0.15, 0.15, 0.1, 0.05, 0.03, 0.02])
-
-            original_price = price / (1 - discount/100) if discount > 0 else price
-
-            # Product name
-            product_name = f"{brand} {category}"
-            
-            # Image URL
-            image_url = category_image_urls.get(category, 'https://via.placeholder.com/400x400?text=Product')
-            
-            # Retailer product URL
-            search_query = product_name.replace(' ', '+')
-            product_url = retailer_urls[retailer] + search_query
-
-            data.append({
-                'brand': brand,
-                'category': category,
-                'product_name': product_name,
-                'material': material,
-                'retailer': retailer,
-                'season': season,
-                'rating': round(rating, 1),
-                'discount_percent': discount,
-                'original_price': round(original_price, 2),
-                'current_price': round(price, 2),
-                'image_url': image_url,
-                'product_url': product_url,
-                'date_scraped': datetime.now().strftime('%Y-%m-%d')
-            })
-
-        return pd.DataFrame(data)
+        # Every column is generated as a whole array: draw integer indices
+        # for each categorical field, then gather per-value lookups with them
+        brand_idx = np.random.randint(len(ALL_BRANDS), size=n_samples)
+        category_idx = np.random.randint(len(CATEGORIES), size=n_samples)
+        material_idx = np.random.randint(len(MATERIALS), size=n_samples)
+        retailer_idx = np.random.randint(len(RETAILERS), size=n_samples)
+        season_idx = np.random.randint(len(SEASONS), size=n_samples)
+
+        # Base price from brand (in INR)
+        price = np.random.uniform(BRAND_MIN_PRICES[brand_idx], BRAND_MAX_PRICES[brand_idx])
+
+        # Apply category, material and retailer adjustments
+        price *= CATEGORY_MULTIPLIER_VALUES[category_idx]
+        price *= MATERIAL_ADJUSTMENT_VALUES[material_idx]
+        price *= RETAILER_ADJUSTMENT_VALUES[retailer_idx]
+
+        # Add some randomness
+        price *= np.random.uniform(0.9, 1.1, size=n_samples)
+
+        # Rating (higher price brands tend to have better ratings)
+        rating = np.minimum(5.0, BRAND_RATINGS[brand_idx] + np.random.uniform(-0.4, 0.4, size=n_samples))
+
+        discount = np.random.choice(DISCOUNT_OPTIONS, size=n_samples, p=DISCOUNT_WEIGHTS)
+
+        # A zero discount leaves the price unchanged
+        original_price = price / (1 - discount / 100)
+
+        return pd.DataFrame({
+            'brand': BRAND_NAMES[brand_idx],
+            'category': CATEGORY_NAMES[category_idx],
+            'product_name': PRODUCT_NAMES[brand_idx, category_idx],
+            'material': MATERIAL_NAMES[material_idx],
+            'retailer': RETAILER_NAMES[retailer_idx],
+            'season': SEASON_NAMES[season_idx],
+            'rating': rating.round(1),
+            'discount_percent': discount,
+            'original_price': original_price.round(2),
+            'current_price': price.round(2),
+            'image_url': CATEGORY_IMAGES[category_idx],
+            'product_url': RETAILER_URL_PREFIXES[retailer_idx] + SEARCH_QUERIES[brand_idx, category_idx],
+            'date_scraped': datetime.now().strftime('%Y-%m-%d')
+        })
 
     def save_data(self, filename='fashion_data.csv'):
         """Save scraped data to CSV"""
@@ -207,6 +225,7 @@ class FashionDataPreprocessor:
 
     def __init__(self):
         self.label_encoders = {}
+        self.class_indices = {}
         self.scaler = StandardScaler()
 
     def preprocess(self, df):
@@ -221,19 +240,32 @@ class FashionDataPreprocessor:
                                              labels=['Budget', 'Mid', 'Premium', 'Luxury', 'Ultra-Luxury'])
 
         # Brand popularity (simplified - based on frequency in dataset)
-        brand_counts = df_processed['brand'].value_counts()
-        df_processed['brand_popularity'] = df_processed['brand'].map(brand_counts)
+        df_processed['brand_popularity'] = (
+            df_processed.groupby('brand')['brand'].transform('size').astype(np.int32)
+        )
 
         # Encode categorical variables
         categorical_cols = ['brand', 'category', 'material', 'retailer', 'season']
 
         for col in categorical_cols:
+            # Categorical codes come from a hash-based factorize; the sorted
+            # categories give the same codes LabelEncoder would
+            categorical = df_processed[col].astype('category')
+            df_processed[f'{col}_encoded'] = categorical.cat.codes.astype(np.int32)
+            
+            # Keep an equivalent LabelEncoder for inverse mapping and saving
             le = LabelEncoder()
-            df_processed[f'{col}_encoded'] = le.fit_transform(df_processed[col])
+            le.classes_ = categorical.cat.categories.to_numpy()
             self.label_encoders[col] = le
+            # Plain dict lookups for encoding single items later
+            self.class_indices[col] = {c: i for i, c in enumerate(le.classes_)}
 
         return df_processed
 
+    def encode_categoricals(self, item):
+        """Encode an item's categorical fields, using 0 for unseen values"""
+        return [self.class_indices[col].get(item[col], 0) for col in self.class_indices]
+
     def prepare_features(self, df):
         """Prepare feature matrix and target variable"""
 
@@ -241,35 +273,61 @@ class FashionDataPreprocessor:
                        'retailer_encoded', 'season_encoded', 'rating',
                        'discount_percent', 'brand_popularity']
 
-        X = df[feature_cols]
-        y = df['current_price']
+        # float32 is what the tree models split on; the encoded columns
+        # are int32, so the cast is exact
+        X = df[feature_cols].astype(np.float32)
+        y = df['current_price'].astype(np.float32)
 
         return X, y
 
     def save_preprocessor(self, filename='fashion_preprocessor.pkl'):
         """Save preprocessor for later use"""
-        with open(filename, 'wb') as f:
-            pickle.dump({
-                'label_encoders': self.label_encoders,
-                'scaler': self.scaler
-            }, f)
+        joblib.dump({
+            'label_encoders': self.label_encoders,
+            'class_indices': self.class_indices,
+            'scaler': self.scaler
+        }, filename, compress=3)
         print(f"Preprocessor saved to {filename}")
 
 
 # 3. MODEL TRAINING MODULE
 
+# The models are fitted side by side, so each multi-threaded estimator gets
+# a share of the cores instead of all of them
+MODEL_THREADS = max(1, (os.cpu_count() or 1) // 3)
+
+
+def fit_with_thread_share(model, X, y):
+    """Fit an estimator whose OpenMP pool would otherwise use every core"""
+    # The OpenMP limit is per thread, so it is set inside the fitting thread
+    with threadpool_limits(limits=MODEL_THREADS, user_api='openmp'):
+        return model.fit(X, y)
+
 
 class FashionPricePredictor:
     """Trains and evaluates price prediction models"""
 
     def __init__(self):
         self.models = {
+            # Each tree sees a 70% bootstrap; the leaf floor keeps trees
+            # small for fitting and predict
             'random_forest': RandomForestRegressor(n_estimators=200, max_depth=20,
-                                                   random_state=42, n_jobs=-1),
-            'gradient_boosting': GradientBoostingRegressor(n_estimators=200,
-                                                          max_depth=10, random_state=42),
+                                                   max_samples=0.7, min_samples_leaf=5,
+                                                   random_state=42, n_jobs=MODEL_THREADS),
+            # Histogram-based split finding bins each feature once instead
+            # of scanning every sample at every split.
+            #
+            # Both boosters stop adding trees once validation error stops
+            # improving for 20 rounds
+            'gradient_boosting': HistGradientBoostingRegressor(max_iter=200,
+                                                               max_depth=10, early_stopping=True,
+                                                               validation_fraction=0.1,
+                                                               n_iter_no_change=20, random_state=42),
             'xgboost': XGBRegressor(n_estimators=200, max_depth=10,
-                                   learning_rate=0.1, random_state=42)
+                                   learning_rate=0.1, tree_method='hist',
+                                   grow_policy='lossguide', max_leaves=64,
+                                   early_stopping_rounds=20, eval_metric='mae',
+                                   n_jobs=MODEL_THREADS, random_state=42)
         }
         self.best_model = None
         self.best_model_name = None
@@ -279,24 +337,42 @@ class FashionPricePredictor:
 
         results = {}
 
+        # Shared by every model's metrics; float64 keeps the sums accurate
+        y_true = np.asarray(y_test, dtype=np.float64)
+        sum_sq_total = np.square(y_true - y_true.mean()).sum()
+        abs_true = np.maximum(np.abs(y_true), 1e-6)
+
         print("\n" + "="*60)
         print("TRAINING MODELS")
         print("="*60)
 
-        for name, model in self.models.items():
-            print(f"\nTraining {name}...")
+        # Train models concurrently; the fits run in native code, so
+        # threads overlap instead of queueing behind one another
+        print(f"\nTraining {', '.join(self.models)} in parallel...")
 
-            # Train model
-            model.fit(X_train, y_train)
+        # XGBoost needs an explicit validation set for early stopping
+        X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.1,
+                                                      random_state=42)
+        Parallel(n_jobs=len(self.models), backend='threading')(
+            delayed(model.fit)(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+            if isinstance(model, XGBRegressor) else delayed(fit_with_thread_share)(model, X_train, y_train)
+            for model in self.models.values()
+        )
+
+        for name, model in self.models.items():
+            print(f"\nEvaluating {name}...")
 
             # Make predictions
             y_pred = model.predict(X_test)
 
-            # Calculate metrics
-            mae = mean_absolute_error(y_test, y_pred)
-            rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-            r2 = r2_score(y_test, y_pred)
-            mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
+            # Calculate metrics from a single error array
+            err = y_pred - y_true
+            abs_err = np.abs(err)
+            sum_sq_err = np.dot(err, err)
+            mae = abs_err.mean()
+            rmse = np.sqrt(sum_sq_err / err.size)
+            r2 = 1 - sum_sq_err / sum_sq_total
+            mape = (abs_err / abs_true).mean() * 100
 
             results[name] = {
                 'model': model,
@@ -323,24 +399,32 @@ class FashionPricePredictor:
 
         return results
 
-    def predict_price(self, features):
-        """Predict price for new item"""
+    def predict_prices(self, features_matrix):
+        """Predict prices for a batch of encoded items in one model call"""
         if self.best_model is None:
             raise ValueError("Model not trained yet!")
 
-        prediction = self.best_model.predict([features])[0]
-        return round(prediction, 2)
+        # Tree models split on float32 internally, so hand them a
+        # contiguous float32 matrix instead of lists they must convert
+        X = np.atleast_2d(np.ascontiguousarray(features_matrix, dtype=np.float32))
+        return self.best_model.predict(X)
+
+    def predict_price(self, features):
+        """Predict price for new item"""
+        prediction = self.predict_prices([features])[0]
+        return round(float(prediction), 2)
 
     def save_model(self, filename='fashion_price_model.pkl'):
         """Save the best trained model"""
         if self.best_model is None:
             raise ValueError("No model to save!")
 
-        with open(filename, 'wb') as f:
-            pickle.dump({
-                'model': self.best_model,
-                'model_name': self.best_model_name
-            }, f)
+        # Tree ensembles are mostly sparse node arrays that compress well;
+        # load with joblib.load
+        joblib.dump({
+            'model': self.best_model,
+            'model_name': self.best_model_name
+        }, filename, compress=3)
         print(f"\nModel saved to {filename}")
 
 
@@ -402,13 +486,7 @@ def main():
         print(f"  {key}: {value}")
 
     # Encode the example
-    encoded_features = []
-    for col in ['brand', 'category', 'material', 'retailer', 'season']:
-        if col in preprocessor.label_encoders and example_item[col] in preprocessor.label_encoders[col].classes_:
-            encoded_val = preprocessor.label_encoders[col].transform([example_item[col]])[0]
-        else:
-            encoded_val = 0
-        encoded_features.append(encoded_val)
+    encoded_features = preprocessor.encode_categoricals(example_item)
 
     encoded_features.extend([
         example_item['rating'],
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for the Closetly apps
+Passed explicitly by the Render start command:
+`gunicorn -c gunicorn.conf.py app:app`
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+
+# Import the app once in the master so lookup tables are shared with the
+# forked workers copy-on-write
+preload_app = True
+
+# Gunicorn's recommended 2 * cores + 1 worker processes, so one worker
+# can be busy on CPU while others serve I/O. Threaded workers: each thread
+# keeps its own SQLite connection. os.cpu_count() reports the host, not a
+# container's CPU/memory quota, so constrained deploys set WEB_CONCURRENCY
+workers = int(os.environ.get('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Keep idle client connections open briefly so browsers reuse them for
+# the follow-up API calls a page makes
+keepalive = 5
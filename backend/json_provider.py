@@ -0,0 +1,34 @@
+"""
+orjson-backed JSON provider shared by the Closetly Flask apps
+Handles jsonify() responses and request body parsing
+"""
+from flask import request
+from flask.json.provider import JSONProvider
+import orjson
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that serializes and parses with orjson"""
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string"""
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        """Parse a JSON string or bytes"""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response straight from orjson's bytes"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option),
+            mimetype='application/json'
+        )
+
+
+def get_request_json():
+    """Parse the request body with orjson, without caching the raw bytes"""
+    return orjson.loads(request.get_data(cache=False))
@@ -2,12 +2,16 @@
 Test script to verify the Closetly application works correctly
 """
 import requests
-import json
+
+BASE_URL = 'http://localhost:10000'
+
+# One keep-alive connection is reused for every test request
+session = requests.Session()
 
 def test_health_endpoint():
     """Test the health endpoint"""
     try:
-        response = requests.get('http://localhost:10000/health')
+        response = session.get(f'{BASE_URL}/health')
         if response.status_code == 200:
             print("✅ Health endpoint test passed")
             print(f"Response: {response.json()}")
@@ -25,7 +29,7 @@ def test_predict_endpoint():
             "retailer": "Myntra",
             "discount_percent": 10
         }
-        response = requests.post('http://localhost:10000/predict', json=data)
+        response = session.post(f'{BASE_URL}/predict', json=data)
         if response.status_code == 200:
             print("✅ Predict endpoint test passed")
             print(f"Response: {response.json()}")
@@ -42,7 +46,7 @@ def test_compare_endpoint():
             "brand": "Levi's",
             "category": "Jeans"
         }
-        response = requests.post('http://localhost:10000/compare', json=data)
+        response = session.post(f'{BASE_URL}/compare', json=data)
         if response.status_code == 200:
             print("✅ Compare endpoint test passed")
             print(f"Response: {response.json()}")
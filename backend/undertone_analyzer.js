@@ -3,6 +3,44 @@
  * Uses multiple factors for highly accurate undertone detection
  */
 
+/**
+ * Recursively freeze a constant table so shared copies cannot be mutated
+ */
+function deepFreeze(obj) {
+    Object.values(obj).forEach(value => {
+        if (value && typeof value === 'object') {
+            deepFreeze(value);
+        }
+    });
+    return Object.freeze(obj);
+}
+
+/**
+ * Recommended palettes per color season, built once and shared by every call
+ */
+const COLOR_PALETTES = deepFreeze({
+    spring: {
+        colors: ['#FFD700', '#FF6B6B', '#FFA07A', '#98D8C8', '#F7DC6F', '#85C1E2', '#FFDAB9', '#FF69B4'],
+        description: 'Warm, bright colors with yellow undertones. Think coral, peach, golden yellow, and warm pink.',
+        avoid: ['Black', 'Pure white', 'Navy', 'Dark purple']
+    },
+    summer: {
+        colors: ['#B4A7D6', '#87CEEB', '#DDA0DD', '#F0E68C', '#E6E6FA', '#AFEEEE', '#C4C4E8', '#FFB6C1'],
+        description: 'Cool, soft colors with blue undertones. Lavender, powder blue, soft pink, and dusty rose.',
+        avoid: ['Orange', 'Warm browns', 'Golden yellows', 'Bright warm colors']
+    },
+    autumn: {
+        colors: ['#CD853F', '#D2691E', '#8B4513', '#DAA520', '#B8860B', '#BC8F8F', '#A0522D', '#8B6508'],
+        description: 'Warm, rich earthy tones. Rust, olive, camel, burgundy, and warm browns.',
+        avoid: ['Bright pink', 'Cool blues', 'Icy pastels', 'Pure black']
+    },
+    winter: {
+        colors: ['#000080', '#8B0000', '#4B0082', '#2F4F4F', '#DC143C', '#1C1C1C', '#191970', '#800020'],
+        description: 'Cool, vivid colors and true neutrals. Navy, burgundy, pure black, pure white, and jewel tones.',
+        avoid: ['Orange', 'Golden yellow', 'Warm browns', 'Muted earth tones']
+    }
+});
+
 class UndertoneAnalyzer {
     constructor() {
         this.weights = {
@@ -12,6 +50,11 @@ class UndertoneAnalyzer {
             whiteClothingEffect: 0.15,
             naturalHairEyeColor: 0.15
         };
+
+        // Only the average skin color is used downstream, so sampling on a
+        // 64x64 grid across the image is as accurate as scanning every pixel
+        // of a phone photo
+        this.sampleGridSize = 64;
     }
 
     /**
@@ -22,8 +65,9 @@ class UndertoneAnalyzer {
      */
     analyzeFromImage(imageData, userInputs = {}) {
         const skinTones = this.extractSkinTones(imageData);
-        const rgbAnalysis = this.analyzeRGBRatios(skinTones);
-        const labAnalysis = this.analyzeLabColor(skinTones);
+        const avgColor = this.averageColor(skinTones);
+        const rgbAnalysis = this.analyzeRGBRatios(avgColor);
+        const labAnalysis = this.analyzeLabColor(avgColor);
         
         let score = {
             warm: 0,
@@ -97,72 +141,88 @@ class UndertoneAnalyzer {
     }
 
     /**
-     * Extract skin tone pixels from image
+     * Extract skin tone pixels from image as per-channel running totals
      */
     extractSkinTones(imageData) {
-        const pixels = [];
         const data = imageData.data;
-        
-        for (let i = 0; i < data.length; i += 4) {
-            const r = data[i];
-            const g = data[i + 1];
-            const b = data[i + 2];
-            
-            // Filter for skin tones using expanded criteria
-            if (this.isSkinTone(r, g, b)) {
-                pixels.push({ r, g, b });
+        let count = 0, totalR = 0, totalG = 0, totalB = 0;
+
+        // Evenly sample large images on a 2-D grid of at most 64x64 pixels
+        const width = imageData.width;
+        const height = imageData.height;
+        const xStep = Math.max(1, Math.ceil(width / this.sampleGridSize));
+        const yStep = Math.max(1, Math.ceil(height / this.sampleGridSize));
+
+        for (let y = 0; y < height; y += yStep) {
+            const rowStart = y * width * 4;
+            for (let x = 0; x < width; x += xStep) {
+                const i = rowStart + x * 4;
+                const r = data[i];
+                const g = data[i + 1];
+                const b = data[i + 2];
+
+                // Filter for skin tones using expanded criteria
+                if (this.isSkinTone(r, g, b)) {
+                    totalR += r;
+                    totalG += g;
+                    totalB += b;
+                    count++;
+                }
             }
         }
         
-        return pixels;
+        return { count, totalR, totalG, totalB };
     }
 
     /**
      * Check if RGB values represent skin tone
      */
     isSkinTone(r, g, b) {
-        // Expanded skin tone detection for diverse skin tones
-        const max = Math.max(r, g, b);
-        const min = Math.min(r, g, b);
-        
-        // Basic skin tone criteria
-        if (r > 95 && g > 40 && b > 20 &&
-            max - min > 15 &&
-            Math.abs(r - g) > 15 &&
-            r > g && r > b) {
-            return true;
+        // Both rules require red to dominate green; this rejects most
+        // background pixels before any other comparison
+        if (r <= g) {
+            return false;
         }
-        
+
+        // Basic skin tone criteria (red is the max channel here)
+        if (r > 95) {
+            return g > 40 && b > 20 && r > b &&
+                r - g > 15 && r - Math.min(g, b) > 15;
+        }
+
         // Dark skin tones
-        if (r > 40 && r < 95 && 
+        return r > 40 && r < 95 &&
             g > 20 && g < 80 &&
             b > 15 && b < 70 &&
-            r > g && g >= b) {
-            return true;
+            g >= b;
+    }
+
+    /**
+     * Average color of the extracted skin pixels (null if none were found)
+     */
+    averageColor(skinTones) {
+        if (skinTones.count === 0) {
+            return null;
         }
-        
-        return false;
+
+        return {
+            r: skinTones.totalR / skinTones.count,
+            g: skinTones.totalG / skinTones.count,
+            b: skinTones.totalB / skinTones.count
+        };
     }
 
     /**
      * Analyze RGB ratios for warmth/coolness
      */
-    analyzeRGBRatios(pixels) {
-        if (pixels.length === 0) {
+    analyzeRGBRatios(avgColor) {
+        if (!avgColor) {
             return { warmth: 0.5, saturation: 0 };
         }
 
-        let totalR = 0, totalG = 0, totalB = 0;
-        
-        pixels.forEach(pixel => {
-            totalR += pixel.r;
-            totalG += pixel.g;
-            totalB += pixel.b;
-        });
-        
-        const avgR = totalR / pixels.length;
-        const avgG = totalG / pixels.length;
-        const avgB = totalB / pixels.length;
+        const avgR = avgColor.r;
+        const avgG = avgColor.g;
+        const avgB = avgColor.b;
         
         // Calculate warmth index (higher = warmer)
         const warmth = (avgR + avgG) / (avgR + avgG + 2 * avgB);
@@ -182,28 +242,15 @@ class UndertoneAnalyzer {
     }
 
     /**
-     * Convert RGB to LAB color space for better analysis
+     * Convert the average skin color to LAB color space for better analysis
      */
-    analyzeLabColor(pixels) {
-        if (pixels.length === 0) {
+    analyzeLabColor(avgColor) {
+        if (!avgColor) {
             return { lValue: 50, aValue: 0, bValue: 0 };
         }
 
-        // Average RGB
-        let avgR = 0, avgG = 0, avgB = 0;
-        pixels.forEach(p => {
-            avgR += p.r;
-            avgG += p.g;
-            avgB += p.b;
-        });
-        avgR /= pixels.length;
-        avgG /= pixels.length;
-        avgB /= pixels.length;
-
-        // Convert to LAB
-        const lab = this.rgbToLab(avgR, avgG, avgB);
-        
-        return lab;
+        // Only the mean is needed, so convert a single color
+        return this.rgbToLab(avgColor.r, avgColor.g, avgColor.b);
     }
 
     /**
@@ -229,9 +276,9 @@ class UndertoneAnalyzer {
         y = y / 100.000;
         z = z / 108.883;
 
-        x = x > 0.008856 ? Math.pow(x, 1/3) : (7.787 * x) + 16/116;
-        y = y > 0.008856 ? Math.pow(y, 1/3) : (7.787 * y) + 16/116;
-        z = z > 0.008856 ? Math.pow(z, 1/3) : (7.787 * z) + 16/116;
+        x = x > 0.008856 ? Math.cbrt(x) : (7.787 * x) + 16/116;
+        y = y > 0.008856 ? Math.cbrt(y) : (7.787 * y) + 16/116;
+        z = z > 0.008856 ? Math.cbrt(z) : (7.787 * z) + 16/116;
 
         const lValue = (116 * y) - 16;
         const aValue = 500 * (x - y);
@@ -280,30 +327,7 @@ class UndertoneAnalyzer {
      * Get recommended colors based on analysis
      */
     getRecommendedColors(colorSeason, undertone) {
-        const colorPalettes = {
-            spring: {
-                colors: ['#FFD700', '#FF6B6B', '#FFA07A', '#98D8C8', '#F7DC6F', '#85C1E2', '#FFDAB9', '#FF69B4'],
-                description: 'Warm, bright colors with yellow undertones. Think coral, peach, golden yellow, and warm pink.',
-                avoid: ['Black', 'Pure white', 'Navy', 'Dark purple']
-            },
-            summer: {
-                colors: ['#B4A7D6', '#87CEEB', '#DDA0DD', '#F0E68C', '#E6E6FA', '#AFEEEE', '#C4C4E8', '#FFB6C1'],
-                description: 'Cool, soft colors with blue undertones. Lavender, powder blue, soft pink, and dusty rose.',
-                avoid: ['Orange', 'Warm browns', 'Golden yellows', 'Bright warm colors']
-            },
-            autumn: {
-                colors: ['#CD853F', '#D2691E', '#8B4513', '#DAA520', '#B8860B', '#BC8F8F', '#A0522D', '#8B6508'],
-                description: 'Warm, rich earthy tones. Rust, olive, camel, burgundy, and warm browns.',
-                avoid: ['Bright pink', 'Cool blues', 'Icy pastels', 'Pure black']
-            },
-            winter: {
-                colors: ['#000080', '#8B0000', '#4B0082', '#2F4F4F', '#DC143C', '#1C1C1C', '#191970', '#800020'],
-                description: 'Cool, vivid colors and true neutrals. Navy, burgundy, pure black, pure white, and jewel tones.',
-                avoid: ['Orange', 'Golden yellow', 'Warm browns', 'Muted earth tones']
-            }
-        };
-        
-        return colorPalettes[colorSeason] || colorPalettes.autumn;
+        return COLOR_PALETTES[colorSeason] || COLOR_PALETTES.autumn;
     }
 }
 
@@ -13,6 +13,8 @@ try:
     # Check if required files exist
     required_files = [
         'app.py',
+        'json_provider.py',
+        'gunicorn.conf.py',
         'closetly_india_complete.html',
         'price_api_integration.js',
         'requirements.txt',
@@ -20,10 +22,9 @@ try:
         'runtime.txt'
     ]
     
-    missing_files = []
-    for file in required_files:
-        if not os.path.exists(file):
-            missing_files.append(file)
+    # One directory scan instead of an exists() call per file
+    present_files = {entry.name for entry in os.scandir('.')}
+    missing_files = [file for file in required_files if file not in present_files]
     
     if missing_files:
         print(f"❌ Missing files: {missing_files}")
@@ -32,12 +33,9 @@ try:
     
     # Check if the Flask app has the expected routes
     expected_routes = ['/', '/health', '/predict', '/compare', '/batch_predict']
-    registered_routes = [rule.rule for rule in app.url_map.iter_rules()]
+    registered_routes = {rule.rule for rule in app.url_map.iter_rules()}
     
-    missing_routes = []
-    for route in expected_routes:
-        if route not in registered_routes:
-            missing_routes.append(route)
+    missing_routes = [route for route in expected_routes if route not in registered_routes]
     
     if missing_routes:
         print(f"❌ Missing routes: {missing_routes}")